@@ -1,7 +1,7 @@
 """
 Autonomous delivery agent that plans and executes delivery routes.
 """
-from typing import List, Tuple, Dict, Optional
+from typing import List, Tuple, Dict, Optional, Iterable
 from dataclasses import dataclass
 from environment import GridEnvironment, Direction
 from algorithms import BFS, UniformCostSearch, AStarSearch, HillClimbing, SimulatedAnnealing
@@ -25,10 +25,17 @@ class DeliveryAgent:
         self.packages_delivered = set()
         self.path_history = [environment.start_position]
         self.status_log = []
+        self._accum_cost: int = 0
         
     def plan_delivery_route(self, algorithm: str = 'astar', 
                           heuristic: str = 'manhattan') -> List[Tuple[int, int]]:
-        """Plan route to deliver all packages"""
+        """
+        Plan route to deliver all packages, visiting the nearest remaining one next.
+        Each leg is one multi-target search: BFS for 'bfs' (nearest by steps), Dijkstra
+        (UCS) for 'ucs' and 'astar' (nearest by cost). A* needs a single goal to aim at,
+        so 'astar' plans exactly like 'ucs' and heuristic has no effect here; it is kept
+        for the signature shared with find_path.
+        """
         if not self.env.packages:
             return []
             
@@ -38,28 +45,33 @@ class DeliveryAgent:
         full_route = []
         
         while remaining_packages:
-            # Find nearest undelivered package
-            nearest_pkg = None
-            min_distance = float('inf')
-            nearest_path = []
-            
-            for pkg_id in remaining_packages:
-                goal_pos = self.env.packages[pkg_id]
-                path = self.find_path(current_pos, goal_pos, algorithm, heuristic)
-                if path and len(path) < min_distance:
-                    min_distance = len(path)
-                    nearest_pkg = pkg_id
-                    nearest_path = path
-                    
-            if nearest_pkg and nearest_path:
-                full_route.extend(nearest_path[1:])  # Skip current position
-                current_pos = self.env.packages[nearest_pkg]
-                remaining_packages.remove(nearest_pkg)
-            else:
+            # One search from current_pos reaches every remaining package
+            goals = {self.env.packages[pkg_id] for pkg_id in remaining_packages}
+            distances = self.find_distances_to_many(current_pos, goals, algorithm)
+            reachable = [pkg_id for pkg_id in remaining_packages
+                         if self.env.packages[pkg_id] in distances]
+            if not reachable:
                 break
                 
+            # Find nearest undelivered package
+            nearest_pkg = min(reachable, key=lambda pkg_id: distances[self.env.packages[pkg_id]][0])
+            nearest_path = distances[self.env.packages[nearest_pkg]][1]
+            full_route.extend(nearest_path[1:])  # Skip current position
+            current_pos = self.env.packages[nearest_pkg]
+            remaining_packages.remove(nearest_pkg)
+                
         return [self.position] + full_route
     
+    def find_distances_to_many(self, start: Tuple[int, int], goals: Iterable[Tuple[int, int]],
+                               algorithm: str = 'astar') -> Dict[Tuple[int, int], Tuple[float, List[Tuple[int, int]]]]:
+        """
+        Distances and paths from start to every reachable goal in a single search.
+        'bfs' counts steps, any other algorithm (including 'astar') runs UCS over costs.
+        """
+        if algorithm == 'bfs':
+            return BFS(self.env).search_many(start, goals)
+        return UniformCostSearch(self.env).search_many(start, goals)
+    
     def find_path(self, start: Tuple[int, int], goal: Tuple[int, int],
                  algorithm: str = 'astar', heuristic: str = 'manhattan') -> Optional[List[Tuple[int, int]]]:
         """Find path using specified algorithm"""
@@ -96,6 +108,7 @@ class DeliveryAgent:
             if self.fuel >= move_cost:
                 self.position = next_pos
                 self.fuel -= move_cost
+                self._accum_cost += move_cost
                 self.time += 1
                 self.path_history.append(next_pos)
                 
@@ -110,7 +123,7 @@ class DeliveryAgent:
                 
         status = DeliveryStatus(
             packages_delivered=self.packages_delivered.copy(),
-            total_cost=sum(self.env.get_terrain_cost(*pos) for pos in self.path_history[1:]),
+            total_cost=self._accum_cost,
             total_time=self.time,
             path_taken=self.path_history.copy()
         )
@@ -143,4 +156,5 @@ class DeliveryAgent:
         self.time = 0
         self.packages_delivered = set()
         self.path_history = [self.env.start_position]
-        self.status_log = []
\ No newline at end of file
+        self.status_log = []
+        self._accum_cost = 0
\ No newline at end of file
@@ -1,32 +1,52 @@
 """
-Search algorithms for path planning: BFS, Uniform-Cost, A*, and local search methods.
+Search algorithms for path planning: BFS, Uniform-Cost, A*, multi-goal A*, and local search methods.
 """
 import heapq
 import math
 import random
-from typing import List, Tuple, Dict, Set, Optional, Callable
+from typing import List, Tuple, Dict, Optional, Callable, Iterable, Iterator
 from collections import deque
-from dataclasses import dataclass, field
-from environment import GridEnvironment, Direction
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from environment import GridEnvironment
+from astar_numba import astar_core, HEURISTIC_IDS
 
-@dataclass(order=True)
-class SearchNode:
-    """Node for search algorithms"""
-    cost: float
-    position: Tuple[int, int] = field(compare=False)
-    time: int = field(compare=False)
-    parent: Optional['SearchNode'] = field(compare=False)
-    action: Optional[Direction] = field(compare=False)
-    packages_delivered: Set[int] = field(compare=False)
-    
-    def __init__(self, position, time=0, parent=None, action=None, 
-                 packages_delivered=None, cost=0):
-        self.position = position
-        self.time = time
-        self.parent = parent
-        self.action = action
-        self.packages_delivered = packages_delivered or set()
-        self.cost = cost
+# Heuristics on absolute coordinate differences, work on scalars and arrays
+def _manhattan(dx, dy):
+    return dx + dy
+
+def _euclidean(dx, dy):
+    return np.sqrt(dx * dx + dy * dy)
+
+def _chebyshev(dx, dy):
+    return np.maximum(dx, dy)
+
+def _zero(dx, dy):
+    return 0 * dx
+
+HEURISTICS: Dict[str, Callable] = {
+    'manhattan': _manhattan,
+    'euclidean': _euclidean,
+    'chebyshev': _chebyshev,
+}
+
+def _path_arrays(env: GridEnvironment, path: List[Tuple[int, int]]) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """Split path[1:] into x and y index arrays, None if it leaves the grid"""
+    arr = np.asarray(path[1:], dtype=np.int32).reshape(-1, 2)
+    xs, ys = arr[:, 0], arr[:, 1]
+    if ((xs < 0) | (xs >= env.width) | (ys < 0) | (ys >= env.height)).any():
+        return None
+    return xs, ys
+
+def path_cost(env: GridEnvironment, path: List[Tuple[int, int]],
+              arrays: Optional[Tuple[np.ndarray, np.ndarray]] = None) -> int:
+    """Terrain cost of every step after the first, off-grid steps cost 999 like get_terrain_cost"""
+    if arrays is None:
+        arrays = _path_arrays(env, path)
+    if arrays is None:
+        return sum(env.get_terrain_cost(x, y) for x, y in path[1:])
+    xs, ys = arrays
+    return int(env.terrain_cost_array[ys, xs].sum())
 
 class SearchAlgorithm:
     """Base class for search algorithms"""
@@ -34,155 +54,394 @@ class SearchAlgorithm:
     def __init__(self, environment: GridEnvironment):
         self.env = environment
         self.nodes_expanded = 0
+        # Search nodes are indices into these parallel arrays
+        capacity = 4 * environment.width * environment.height + 1
+        self._parent = np.empty(capacity, dtype=np.int32)
+        self._pos = np.empty(capacity, dtype=np.int32)  # Packed as y * width + x
+        self._g = np.empty(capacity, dtype=np.float32)
+        self._time = np.empty(capacity, dtype=np.int32)
+        self._n = 0
+        # Per-cell best cost and closed flags for cost-ordered searches
+        shape = (environment.height, environment.width)
+        self._g_costs = np.full(shape, np.inf, dtype=np.float32)
+        self._closed = np.zeros(shape, dtype=np.uint8)
+        
+    def _reset_grids(self):
+        """Clear per-cell search state, resizing if the environment changed"""
+        shape = (self.env.height, self.env.width)
+        if self._g_costs.shape != shape:
+            self._g_costs = np.full(shape, np.inf, dtype=np.float32)
+            self._closed = np.zeros(shape, dtype=np.uint8)
+        else:
+            self._g_costs.fill(np.inf)
+            self._closed.fill(0)
         
-    def reconstruct_path(self, node: SearchNode) -> List[Tuple[int, int]]:
+    def _reset_nodes(self):
+        """Forget all stored nodes before a new search"""
+        self._n = 0
+        
+    def _grow_nodes(self):
+        """Double the node storage capacity"""
+        capacity = 2 * len(self._parent)
+        for name in ('_parent', '_pos', '_g', '_time'):
+            old = getattr(self, name)
+            new = np.empty(capacity, dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
+            
+    def add_node(self, position: Tuple[int, int], parent_idx: int = -1,
+                 g: float = 0, time: int = 0) -> int:
+        """Store a node and return its index"""
+        if self._n == len(self._parent):
+            self._grow_nodes()
+        idx = self._n
+        self._parent[idx] = parent_idx
+        self._pos[idx] = position[1] * self.env.width + position[0]
+        self._g[idx] = g
+        self._time[idx] = time
+        self._n += 1
+        return idx
+    
+    def add_successor(self, parent_idx: int, new_pos: Tuple[int, int], new_g: float) -> int:
+        """Store a child of parent_idx one time step later"""
+        return self.add_node(new_pos, parent_idx, new_g, self._time[parent_idx] + 1)
+    
+    def position(self, idx: int) -> Tuple[int, int]:
+        """Grid position of a stored node"""
+        y, x = divmod(int(self._pos[idx]), self.env.width)
+        return (x, y)
+        
+    def reconstruct_path(self, idx: int) -> List[Tuple[int, int]]:
         """Reconstruct path from goal node to start"""
         path = []
-        current = node
-        while current:
-            path.append(current.position)
-            current = current.parent
+        while idx != -1:
+            path.append(self.position(idx))
+            idx = self._parent[idx]
         return path[::-1]
     
-    def get_successors(self, node: SearchNode) -> List[SearchNode]:
-        """Generate successor nodes"""
+    def get_successors(self, idx: int) -> List[Tuple[int, int, int]]:
+        """Valid moves (x, y, cost) out of a stored node"""
         self.nodes_expanded += 1
-        x, y = node.position
-        successors = []
-        
-        moves = self.env.get_valid_moves(x, y, node.time)
-        for new_x, new_y, move_cost in moves:
-            # Check if this move delivers a package
-            new_packages = node.packages_delivered.copy()
-            for pkg_id, delivery_pos in self.env.packages.items():
-                if (new_x, new_y) == delivery_pos and pkg_id not in new_packages:
-                    new_packages.add(pkg_id)
-            
-            new_node = SearchNode(
-                position=(new_x, new_y),
-                time=node.time + 1,
-                parent=node,
-                cost=node.cost + move_cost,
-                packages_delivered=new_packages
-            )
-            successors.append(new_node)
-            
-        return successors
+        x, y = self.position(idx)
+        return self.env.get_valid_moves(x, y, int(self._time[idx]))
 
 class BFS(SearchAlgorithm):
     """Breadth-First Search implementation"""
     
-    def search(self, start: Tuple[int, int], goal: Tuple[int, int] = None) -> Optional[List[Tuple[int, int]]]:
-        """BFS search for single goal"""
-        queue = deque([SearchNode(start)])
-        visited = set([start])
+    def _explore(self, start: Tuple[int, int]) -> Iterator[Tuple[int, np.ndarray]]:
+        """Yield packed cells in BFS order together with the parent array"""
+        env = self.env
+        w, h = env.width, env.height
+        
+        # Cells are packed as y * width + x, visited is a flat bitmap
+        visited = np.zeros(w * h, dtype=np.uint8)
+        parent = np.full(w * h, -1, dtype=np.int32)
+        depth = np.zeros(w * h, dtype=np.int32)
+        start_packed = start[1] * w + start[0]
+        queue = deque([start_packed])
+        visited[start_packed] = 1
         
         while queue:
-            current = queue.popleft()
+            cur = queue.popleft()
+            yield cur, parent
             
+            self.nodes_expanded += 1
+            y, x = divmod(cur, w)
+            t = int(depth[cur])
+            for nx, ny in ((x, y - 1), (x, y + 1), (x - 1, y), (x + 1, y)):
+                if 0 <= nx < w and 0 <= ny < h:
+                    np_pos = ny * w + nx
+                    if not visited[np_pos] and not env.is_obstructed(nx, ny, t):
+                        visited[np_pos] = 1
+                        parent[np_pos] = cur
+                        depth[np_pos] = t + 1
+                        queue.append(np_pos)
+                        
+    def _unpack_path(self, parent: np.ndarray, cur: int) -> List[Tuple[int, int]]:
+        """Follow the parent array back from a packed cell"""
+        w = self.env.width
+        path = [cur]
+        while parent[cur] != -1:
+            cur = int(parent[cur])
+            path.append(cur)
+        return [(p % w, p // w) for p in reversed(path)]
+    
+    def search(self, start: Tuple[int, int], goal: Tuple[int, int] = None) -> Optional[List[Tuple[int, int]]]:
+        """BFS search for single goal"""
+        if not self.env.is_within_bounds(*start):
+            return None
+        w = self.env.width
+        goal_packed = goal[1] * w + goal[0] if goal and self.env.is_within_bounds(*goal) else -1
+        
+        for cur, parent in self._explore(start):
             # Check if goal reached
-            if current.position == goal:
-                return self.reconstruct_path(current)
-            
-            for successor in self.get_successors(current):
-                if successor.position not in visited:
-                    visited.add(successor.position)
-                    queue.append(successor)
+            if cur == goal_packed:
+                return self._unpack_path(parent, cur)
                     
         return None
+    
+    def search_many(self, start: Tuple[int, int], 
+                    goals: Iterable[Tuple[int, int]]) -> Dict[Tuple[int, int], Tuple[float, List[Tuple[int, int]]]]:
+        """One BFS to several goals, returns {goal: (steps, path)} for the reachable ones"""
+        results = {}
+        if not self.env.is_within_bounds(*start):
+            return results
+        w = self.env.width
+        remaining = {g[1] * w + g[0]: g for g in goals if self.env.is_within_bounds(*g)}
+        
+        for cur, parent in self._explore(start):
+            if not remaining:
+                break
+            if cur in remaining:
+                path = self._unpack_path(parent, cur)
+                results[remaining.pop(cur)] = (len(path) - 1, path)
+                
+        return results
 
 class UniformCostSearch(SearchAlgorithm):
     """Uniform-Cost Search implementation"""
     
-    def search(self, start: Tuple[int, int], goal: Tuple[int, int] = None) -> Optional[List[Tuple[int, int]]]:
-        """UCS search for single goal"""
+    def _explore(self, start: Tuple[int, int]) -> Iterator[Tuple[Tuple[int, int], float, int]]:
+        """Yield (position, cost, node) for cells in the order they are settled"""
+        self._reset_nodes()
+        self._reset_grids()
+        g_costs, closed = self._g_costs, self._closed
+        
+        # heapq has no decrease-key, stale duplicates are skipped via the closed bitmap.
+        # Entries are (cost, node) and the node index doubles as a FIFO tiebreaker
         frontier = []
-        heapq.heappush(frontier, (0, SearchNode(start)))
-        visited_costs = {start: 0}
+        heapq.heappush(frontier, (0.0, self.add_node(start)))
+        g_costs[start[1], start[0]] = 0
         
         while frontier:
             current_cost, current = heapq.heappop(frontier)
+            x, y = position = self.position(current)
             
-            if current_cost > visited_costs.get(current.position, float('inf')):
+            if closed[y, x]:
                 continue
-                
-            if current.position == goal:
-                return self.reconstruct_path(current)
+            closed[y, x] = 1
+            yield position, current_cost, current
             
-            for successor in self.get_successors(current):
-                if (successor.position not in visited_costs or 
-                    successor.cost < visited_costs[successor.position]):
-                    visited_costs[successor.position] = successor.cost
-                    heapq.heappush(frontier, (successor.cost, successor))
+            for new_x, new_y, move_cost in self.get_successors(current):
+                if closed[new_y, new_x]:
+                    continue
+                new_cost = current_cost + move_cost
+                if new_cost < g_costs[new_y, new_x]:
+                    g_costs[new_y, new_x] = new_cost
+                    successor = self.add_successor(current, (new_x, new_y), new_cost)
+                    heapq.heappush(frontier, (new_cost, successor))
+    
+    def search(self, start: Tuple[int, int], goal: Tuple[int, int] = None) -> Optional[List[Tuple[int, int]]]:
+        """UCS search for single goal"""
+        if not self.env.is_within_bounds(*start):
+            return None
+            
+        for position, _, current in self._explore(start):
+            if position == goal:
+                return self.reconstruct_path(current)
                     
         return None
+    
+    def search_many(self, start: Tuple[int, int], 
+                    goals: Iterable[Tuple[int, int]]) -> Dict[Tuple[int, int], Tuple[float, List[Tuple[int, int]]]]:
+        """One Dijkstra run to several goals, returns {goal: (cost, path)} for the reachable ones"""
+        results = {}
+        if not self.env.is_within_bounds(*start):
+            return results
+        remaining = set(goals)
+        
+        for position, cost, current in self._explore(start):
+            if not remaining:
+                break
+            if position in remaining:
+                remaining.discard(position)
+                results[position] = (cost, self.reconstruct_path(current))
+                
+        return results
 
 class AStarSearch(SearchAlgorithm):
     """A* Search implementation with configurable heuristics"""
     
-    def __init__(self, environment: GridEnvironment, heuristic: str = 'manhattan'):
+    def __init__(self, environment: GridEnvironment, heuristic: str = 'manhattan',
+                 use_jit: bool = True):
         super().__init__(environment)
         self.heuristic = heuristic
+        # The compiled search is used by default, the Python loop is the reference
+        self.use_jit = use_jit
+        self._h_fn = HEURISTICS.get(heuristic, _zero)
         
     def calculate_heuristic(self, pos: Tuple[int, int], goal: Tuple[int, int]) -> float:
         """Calculate heuristic value"""
-        x1, y1 = pos
-        x2, y2 = goal
-        
-        if self.heuristic == 'manhattan':
-            return abs(x1 - x2) + abs(y1 - y2)
-        elif self.heuristic == 'euclidean':
-            return math.sqrt((x1 - x2)**2 + (y1 - y2)**2)
-        elif self.heuristic == 'chebyshev':
-            return max(abs(x1 - x2), abs(y1 - y2))
-        else:
-            return 0
+        return float(self._h_fn(abs(pos[0] - goal[0]), abs(pos[1] - goal[1])))
+    
+    def heuristic_map(self, goal: Tuple[int, int]) -> np.ndarray:
+        """Heuristic value of every cell for a goal, computed in one vectorized pass"""
+        ys, xs = np.indices((self.env.height, self.env.width))
+        return self._h_fn(np.abs(xs - goal[0]), np.abs(ys - goal[1])).astype(np.float64)
     
     def search(self, start: Tuple[int, int], goal: Tuple[int, int]) -> Optional[List[Tuple[int, int]]]:
         """A* search for single goal"""
+        if not self.use_jit:
+            return self._search_python(start, goal)
+        if not (self.env.is_within_bounds(*start) and self.env.is_within_bounds(*goal)):
+            return None
+            
+        env = self.env
+        w = env.width
+        while True:
+            parent, expanded, overflow = astar_core(
+                env.padded_cost_array, env.padded_static_mask, env.dynamic_occupancy,
+                env.height, w, start[0], start[1], goal[0], goal[1],
+                HEURISTIC_IDS.get(self.heuristic, -1))
+            if not overflow:
+                break
+            # Path ran past the precomputed obstacle table, extend it and retry
+            env.ensure_horizon(2 * len(env.dynamic_occupancy))
+        self.nodes_expanded += expanded
+        
+        # Unpack from padded coordinates
+        stride = w + 2
+        pos = (goal[1] + 1) * stride + goal[0] + 1
+        if parent[pos] == -1:
+            return None
+        path = [goal]
+        while parent[pos] != pos:
+            pos = int(parent[pos])
+            path.append((pos % stride - 1, pos // stride - 1))
+        return path[::-1]
+    
+    def _search_python(self, start: Tuple[int, int], goal: Tuple[int, int]) -> Optional[List[Tuple[int, int]]]:
+        """A* search for single goal in pure Python"""
+        if not (self.env.is_within_bounds(*start) and self.env.is_within_bounds(*goal)):
+            return None
+            
+        self._reset_nodes()
+        self._reset_grids()
+        g_costs, closed = self._g_costs, self._closed
+        w = self.env.width
+        goal_packed = goal[1] * w + goal[0]
+        hmap = self.heuristic_map(goal)
+        
+        # Heap entries are (scaled f, packed position, node) so ties never compare nodes
         frontier = []
-        start_node = SearchNode(start)
-        start_f = self.calculate_heuristic(start, goal)
-        heapq.heappush(frontier, (start_f, start_node))
+        start_f = hmap[start[1], start[0]]
+        heapq.heappush(frontier, (int(start_f * 1024), start[1] * w + start[0], self.add_node(start)))
+        g_costs[start[1], start[0]] = 0
         
-        g_costs = {start: 0}
+        while frontier:
+            _, packed, current = heapq.heappop(frontier)
+            y, x = divmod(packed, w)
+            
+            # Skip entries for closed cells or superseded by a cheaper push
+            if closed[y, x] or self._g[current] > g_costs[y, x]:
+                continue
+            closed[y, x] = 1
+            
+            if packed == goal_packed:
+                return self.reconstruct_path(current)
+            
+            current_g = float(self._g[current])
+            for new_x, new_y, move_cost in self.get_successors(current):
+                if closed[new_y, new_x]:
+                    continue
+                    
+                new_g = current_g + move_cost
+                if new_g < g_costs[new_y, new_x]:
+                    g_costs[new_y, new_x] = new_g
+                    f = new_g + hmap[new_y, new_x]
+                    successor = self.add_successor(current, (new_x, new_y), new_g)
+                    heapq.heappush(frontier, (int(f * 1024), new_y * w + new_x, successor))
+                    
+        return None
+
+class MultiGoalAStar(AStarSearch):
+    """A* over (position, delivered packages) states that visits every package"""
+    
+    def search(self, start: Tuple[int, int], goal: Tuple[int, int] = None) -> Optional[List[Tuple[int, int]]]:
+        """A* search for a route delivering all packages (goal is ignored)"""
+        self._reset_nodes()
+        # Delivered packages are a bitmask, one bit per package
+        goals = list(self.env.packages.values())
+        bits = {}
+        for i, delivery_pos in enumerate(goals):
+            bits[delivery_pos] = bits.get(delivery_pos, 0) | (1 << i)
+        all_delivered = (1 << len(goals)) - 1
+        n_cells = self.env.width * self.env.height
+        
+        # Nested lists so f stays a plain float, numpy scalars make every heap comparison a method call
+        hmaps = [self.heuristic_map(delivery_pos).tolist() for delivery_pos in goals]
+        
+        def heuristic(pos, mask):
+            return max((hmaps[i][pos[1]][pos[0]] for i in range(len(goals))
+                        if not mask & (1 << i)), default=0.0)
+        
+        # Heap entries are (f, node); node indices are handed out in push order, so they are
+        # a monotonic int tiebreaker and ties never reach anything but int comparison
+        frontier = []
+        node_masks = [0]
+        heapq.heappush(frontier, (heuristic(start, 0), self.add_node(start)))
+        g_costs = {}
         visited = set()
         
         while frontier:
             current_f, current = heapq.heappop(frontier)
+            mask = node_masks[current]
+            state = mask * n_cells + int(self._pos[current])
             
-            if current.position in visited:
+            if state in visited:
                 continue
-            visited.add(current.position)
+            visited.add(state)
             
-            if current.position == goal:
+            if mask == all_delivered:
                 return self.reconstruct_path(current)
             
-            for successor in self.get_successors(current):
-                if successor.position in visited:
+            current_g = float(self._g[current])
+            for new_x, new_y, move_cost in self.get_successors(current):
+                new_mask = mask | bits.get((new_x, new_y), 0)
+                new_state = new_mask * n_cells + new_y * self.env.width + new_x
+                if new_state in visited:
                     continue
                     
-                new_g = current.cost + self.env.get_terrain_cost(*successor.position)
-                if successor.position not in g_costs or new_g < g_costs[successor.position]:
-                    g_costs[successor.position] = new_g
-                    h = self.calculate_heuristic(successor.position, goal)
-                    f = new_g + h
-                    heapq.heappush(frontier, (f, successor))
+                new_g = current_g + move_cost
+                if new_state not in g_costs or new_g < g_costs[new_state]:
+                    g_costs[new_state] = new_g
+                    f = new_g + heuristic((new_x, new_y), new_mask)
+                    heapq.heappush(frontier, (f, self.add_successor(current, (new_x, new_y), new_g)))
+                    node_masks.append(new_mask)
                     
         return None
 
 class HillClimbing:
     """Hill Climbing with Random Restarts for replanning"""
     
-    def __init__(self, environment: GridEnvironment, max_restarts: int = 10):
+    def __init__(self, environment: GridEnvironment, max_restarts: int = 10,
+                 max_workers: Optional[int] = 1):
         self.env = environment
         self.max_restarts = max_restarts
+        # Restarts run in worker processes when > 1 (None uses every core)
+        self.max_workers = max_workers
         
     def evaluate_path(self, path: List[Tuple[int, int]]) -> float:
         """Evaluate path quality (lower is better)"""
         if not path:
             return float('inf')
             
+        arrays = _path_arrays(self.env, path)
+        if arrays is None:
+            return self._evaluate_path_slow(path)
+        xs, ys = arrays
+        
+        # Step i enters path[i + 1] and is checked against obstacles at time i
+        self.env.ensure_horizon(len(xs))
+        total_cost = path_cost(self.env, path, arrays)
+        blocked = self.env.static_mask[ys, xs].astype(bool)
+        if self.env.dynamic_obstacles:
+            times = np.arange(len(xs))
+            blocked |= self.env.dynamic_occupancy[times, ys, xs].astype(bool)
+        return total_cost + 1000 * int(blocked.sum())
+    
+    def _evaluate_path_slow(self, path: List[Tuple[int, int]]) -> float:
+        """Cell-by-cell evaluation, used for paths that leave the grid"""
         total_cost = 0
         time = 0
         for i in range(1, len(path)):
@@ -196,26 +455,72 @@ class HillClimbing:
             
         return total_cost
     
-    def generate_neighbor(self, path: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
-        """Generate a neighboring path by making a small change"""
+    def evaluate_path_delta(self, old_score: float, delta_info: List[tuple]) -> float:
+        """Rescore a path from old_score given its (index, old_cell, new_cell) edits"""
+        score = old_score
+        for i, old_cell, new_cell in delta_info:
+            # path[i] is entered at time i - 1, as in evaluate_path
+            for cell, sign in ((old_cell, -1), (new_cell, 1)):
+                cell_cost = self.env.get_terrain_cost(*cell)
+                if self.env.is_obstructed(*cell, i - 1):
+                    cell_cost += 1000
+                score += sign * cell_cost
+        return score
+    
+    def generate_neighbor(self, path: List[Tuple[int, int]],
+                          rng: random.Random = random) -> Tuple[List[Tuple[int, int]], Optional[List[tuple]]]:
+        """
+        Generate a neighboring path by making a small change.
+        Returns (new_path, delta_info) where delta_info lists the
+        (index, old_cell, new_cell) edits, or None if the length changed.
+        """
         if len(path) <= 2:
-            return path
+            return path, []
+            
+        # Rarely reroute a whole segment, the search makes this the expensive move
+        if rng.random() < 0.05:
+            return self.reroute_segment(path, rng), None
             
-        # Randomly modify a segment of the path
         new_path = path.copy()
-        start_idx = random.randint(1, len(path) - 2)
-        end_idx = min(start_idx + random.randint(1, 3), len(path) - 1)
+        i = rng.randint(1, len(path) - 2)
+        prev_pos, next_pos = path[i - 1], path[i + 1]
+        
+        # Path steps out and straight back, drop the detour
+        if prev_pos == next_pos:
+            del new_path[i:i + 2]
+            return new_path, None
+            
+        # Move a single cell to another one adjacent to both of its neighbors
+        candidates = []
+        for dx, dy in [(0, 1), (1, 0), (0, -1), (-1, 0)]:
+            cand = (prev_pos[0] + dx, prev_pos[1] + dy)
+            if (cand != path[i] and
+                abs(cand[0] - next_pos[0]) + abs(cand[1] - next_pos[1]) == 1 and
+                self.env.is_within_bounds(*cand) and
+                not self.env.is_obstructed(*cand, i - 1)):
+                candidates.append(cand)
+        if not candidates:
+            return new_path, []
+        new_path[i] = rng.choice(candidates)
+        return new_path, [(i, path[i], new_path[i])]
+    
+    def reroute_segment(self, path: List[Tuple[int, int]],
+                        rng: random.Random = random) -> List[Tuple[int, int]]:
+        """Replace a short random segment of the path with a fresh BFS route"""
+        new_path = path.copy()
+        start_idx = rng.randint(1, len(path) - 2)
+        end_idx = min(start_idx + rng.randint(1, 3), len(path) - 1)
         
         # Try to find an alternative route for this segment
         segment_start = path[start_idx - 1]
         segment_end = path[end_idx]
         
-        # Use A* for the segment (simplified)
         try:
             alt_segment = self.find_alternative_route(segment_start, segment_end, 
                                                      path[start_idx:end_idx])
             if alt_segment:
-                new_path = path[:start_idx] + alt_segment + path[end_idx:]
+                # alt_segment already ends at segment_end
+                new_path = path[:start_idx] + alt_segment + path[end_idx + 1:]
         except:
             pass
             
@@ -246,40 +551,55 @@ class HillClimbing:
                     
         return None
     
+    def _single_restart(self, seed: int, path: List[Tuple[int, int]]) -> Tuple[List[Tuple[int, int]], float]:
+        """Run one hill-climbing restart from path with its own random stream"""
+        rng = random.Random(seed)
+        current_path = path.copy()
+        current_score = self.evaluate_path(current_path)
+        improvements = 0
+        
+        for _ in range(100):  # Max iterations per restart
+            neighbor, delta_info = self.generate_neighbor(current_path, rng)
+            if delta_info is None:
+                neighbor_score = self.evaluate_path(neighbor)
+            else:
+                neighbor_score = self.evaluate_path_delta(current_score, delta_info)
+            
+            if neighbor_score < current_score:
+                current_path, current_score = neighbor, neighbor_score
+                improvements += 1
+            else:
+                # With small probability, accept worse solution
+                if rng.random() < 0.1:
+                    current_path, current_score = neighbor, neighbor_score
+            
+            if improvements >= 10:  # Stop if no improvement
+                break
+                
+        return current_path, current_score
+    
     def search(self, start: Tuple[int, int], goal: Tuple[int, int], 
                initial_path: List[Tuple[int, int]] = None) -> List[Tuple[int, int]]:
         """Hill climbing search with random restarts"""
         best_path = initial_path or []
         best_score = self.evaluate_path(best_path)
         
-        for restart in range(self.max_restarts):
-            if not best_path:
-                # Generate initial path using A*
-                astar = AStarSearch(self.env)
-                current_path = astar.search(start, goal) or []
-            else:
-                current_path = best_path.copy()
-                
-            current_score = self.evaluate_path(current_path)
-            improvements = 0
+        if not best_path:
+            # Generate initial path using A*
+            best_path = AStarSearch(self.env).search(start, goal) or []
             
-            for _ in range(100):  # Max iterations per restart
-                neighbor = self.generate_neighbor(current_path)
-                neighbor_score = self.evaluate_path(neighbor)
-                
-                if neighbor_score < current_score:
-                    current_path, current_score = neighbor, neighbor_score
-                    improvements += 1
-                else:
-                    # With small probability, accept worse solution
-                    if random.random() < 0.1:
-                        current_path, current_score = neighbor, neighbor_score
+        # Restarts are independent, each gets its own seed from the global generator
+        seeds = [random.randrange(2**32) for _ in range(self.max_restarts)]
+        paths = [best_path] * self.max_restarts
+        if self.max_workers == 1:
+            results = map(self._single_restart, seeds, paths)
+        else:
+            with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+                results = list(executor.map(self._single_restart, seeds, paths))
                 
-                if improvements >= 10:  # Stop if no improvement
-                    break
-            
-            if current_score < best_score:
-                best_path, best_score = current_path, current_score
+        for path, score in results:
+            if score < best_score:
+                best_path, best_score = path, score
                 
         return best_path
 
@@ -304,8 +624,8 @@ class SimulatedAnnealing:
         temperature = self.initial_temp
         
         while temperature > 1:
-            neighbor = self.generate_neighbor(current_path)
-            neighbor_score = self.evaluate_path(neighbor)
+            neighbor, delta_info = self.generate_neighbor(current_path)
+            neighbor_score = self.evaluate_path_delta(current_score, delta_info)
             
             # Always accept better solutions
             if neighbor_score < current_score:
@@ -326,16 +646,22 @@ class SimulatedAnnealing:
         """Same evaluation as HillClimbing"""
         if not path:
             return float('inf')
-        total_cost = sum(self.env.get_terrain_cost(x, y) for x, y in path[1:])
-        return total_cost
+        return path_cost(self.env, path)
+    
+    def evaluate_path_delta(self, old_score: float, delta_info: List[tuple]) -> float:
+        """Rescore a path from old_score given its (index, old_cell, new_cell) edits"""
+        score = old_score
+        for _, old_cell, new_cell in delta_info:
+            score += self.env.get_terrain_cost(*new_cell) - self.env.get_terrain_cost(*old_cell)
+        return score
     
-    def generate_neighbor(self, path: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
-        """Generate neighbor path (simplified version)"""
+    def generate_neighbor(self, path: List[Tuple[int, int]]) -> Tuple[List[Tuple[int, int]], List[tuple]]:
+        """Generate neighbor path (simplified version), returns (new_path, delta_info)"""
         if len(path) <= 3:
-            return path
+            return path, []
             
         new_path = path.copy()
         # Randomly swap two segments
         i, j = random.sample(range(1, len(path) - 1), 2)
         new_path[i], new_path[j] = new_path[j], new_path[i]
-        return new_path
\ No newline at end of file
+        return new_path, [(i, path[i], new_path[i]), (j, path[j], new_path[j])]
\ No newline at end of file
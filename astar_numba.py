@@ -0,0 +1,160 @@
+"""
+Numba-compiled A* core operating on flat numpy grids.
+"""
+import math
+import numpy as np
+from numba import njit
+
+# Heuristic ids understood by astar_core
+HEURISTIC_IDS = {'manhattan': 0, 'euclidean': 1, 'chebyshev': 2}
+
+@njit(cache=True)
+def _heuristic(x, y, gx, gy, heuristic_id):
+    """Heuristic value between (x, y) and the goal"""
+    dx = abs(x - gx)
+    dy = abs(y - gy)
+    if heuristic_id == 0:
+        return float(dx + dy)
+    elif heuristic_id == 1:
+        return math.sqrt(dx * dx + dy * dy)
+    elif heuristic_id == 2:
+        return float(max(dx, dy))
+    return 0.0
+
+@njit(cache=True)
+def _heap_less(primary, secondary, i, j):
+    """Lexicographic (primary, secondary) comparison of heap slots i and j"""
+    if primary[i] != primary[j]:
+        return primary[i] < primary[j]
+    return secondary[i] < secondary[j]
+
+@njit(cache=True)
+def _heap_swap(primary, secondary, items, i, j):
+    primary[i], primary[j] = primary[j], primary[i]
+    secondary[i], secondary[j] = secondary[j], secondary[i]
+    items[i], items[j] = items[j], items[i]
+
+@njit(cache=True)
+def _heap_push(primary, secondary, items, size, key, tiebreak, item):
+    """Push (key, tiebreak, item) onto the array-backed min-heap, returns new size"""
+    i = size
+    primary[i] = key
+    secondary[i] = tiebreak
+    items[i] = item
+    # Sift up
+    while i > 0:
+        parent = (i - 1) >> 1
+        if not _heap_less(primary, secondary, i, parent):
+            break
+        _heap_swap(primary, secondary, items, i, parent)
+        i = parent
+    return size + 1
+
+@njit(cache=True)
+def _heap_pop(primary, secondary, items, size):
+    """Pop the smallest item from the heap, returns (item, new size)"""
+    item = items[0]
+    size -= 1
+    primary[0] = primary[size]
+    secondary[0] = secondary[size]
+    items[0] = items[size]
+    # Sift down
+    i = 0
+    while True:
+        left = 2 * i + 1
+        if left >= size:
+            break
+        child = left
+        if left + 1 < size and _heap_less(primary, secondary, left + 1, left):
+            child = left + 1
+        if not _heap_less(primary, secondary, child, i):
+            break
+        _heap_swap(primary, secondary, items, child, i)
+        i = child
+    return item, size
+
+@njit(cache=True)
+def astar_core(cost_padded, static_padded, dyn_occ, h, w, sx, sy, gx, gy, heuristic_id):
+    """
+    A* over a 4-connected grid.
+
+    cost_padded and static_padded are (h+2, w+2) arrays with a ring of
+    blocked sentinel cells, so neighbors never need a bounds check. Cells
+    are packed as (y+1)*(w+2) + (x+1). dyn_occ[t, y, x] marks dynamic
+    obstacles at time t in unpadded coordinates; an empty table means there
+    are none. Returns (parent, expanded, overflow) where parent[packed] is
+    the packed predecessor (the start points to itself, -1 means
+    unreached). overflow is set when the search needed a time step past the
+    end of dyn_occ, in which case the result is incomplete.
+    
+    Frontier order matches AStarSearch._search_python exactly: entries are
+    ordered by (int(f * 1024), unpadded y * w + x, push order). With dynamic
+    obstacles tie-breaking decides which arrival time closes a cell, so any
+    other order can change reachability.
+    """
+    stride = w + 2
+    n = (h + 2) * stride
+    cost = cost_padded.ravel()
+    blocked = static_padded.ravel()
+    g = np.full(n, np.inf, dtype=np.float32)
+    closed = np.zeros(n, dtype=np.uint8)
+    parent = np.full(n, -1, dtype=np.int64)
+    depth = np.zeros(n, dtype=np.int64)
+    t_horizon = dyn_occ.shape[0]
+
+    # Lazy deletion pushes at most 4 entries per expansion
+    capacity = 4 * h * w + 1
+    heap_keys = np.empty(capacity, dtype=np.int64)
+    # Unpadded position * capacity + push counter, both below capacity
+    heap_ties = np.empty(capacity, dtype=np.int64)
+    heap_items = np.empty(capacity, dtype=np.int64)
+    size = 0
+    pushes = 0
+
+    start = (sy + 1) * stride + sx + 1
+    goal = (gy + 1) * stride + gx + 1
+    g[start] = 0.0
+    parent[start] = start
+    start_f = _heuristic(sx, sy, gx, gy, heuristic_id)
+    size = _heap_push(heap_keys, heap_ties, heap_items, size, np.int64(start_f * 1024),
+                      (sy * w + sx) * capacity + pushes, start)
+    pushes += 1
+
+    # Up, down, left, right as packed offsets
+    offsets = (-stride, stride, -1, 1)
+    expanded = 0
+
+    while size > 0:
+        pos, size = _heap_pop(heap_keys, heap_ties, heap_items, size)
+        if closed[pos]:
+            continue
+        closed[pos] = 1
+
+        if pos == goal:
+            break
+
+        # Moves out of a node are checked against obstacles at its own time step
+        t = depth[pos]
+        if t_horizon > 0 and t >= t_horizon:
+            return parent, expanded, True
+            
+        expanded += 1
+        for k in range(4):
+            npos = pos + offsets[k]
+            if blocked[npos] or closed[npos]:
+                continue
+            nx = npos % stride - 1
+            ny = npos // stride - 1
+            if t_horizon > 0 and dyn_occ[t, ny, nx]:
+                continue
+            new_g = g[pos] + cost[npos]
+            if new_g < g[npos]:
+                g[npos] = new_g
+                parent[npos] = pos
+                depth[npos] = t + 1
+                f = new_g + _heuristic(nx, ny, gx, gy, heuristic_id)
+                size = _heap_push(heap_keys, heap_ties, heap_items, size, np.int64(f * 1024),
+                                  (ny * w + nx) * capacity + pushes, npos)
+                pushes += 1
+
+    return parent, expanded, False
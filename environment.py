@@ -3,6 +3,7 @@ Environment module for the autonomous delivery agent.
 Models the grid world with static/dynamic obstacles and terrain costs.
 """
 import numpy as np
+from collections import OrderedDict
 from typing import List, Tuple, Dict, Set, Optional
 from enum import Enum
 
@@ -29,6 +30,13 @@ class DynamicObstacle:
         self.interval = interval
         self.step_count = 0
         self.history = [start_pos]
+        # Prefix sums of pattern displacements for closed-form prediction
+        self._dxs = np.array([d.value[0] for d in pattern], dtype=np.int32)
+        self._dys = np.array([d.value[1] for d in pattern], dtype=np.int32)
+        self._prefix_x = np.concatenate(([0], np.cumsum(self._dxs)))
+        self._prefix_y = np.concatenate(([0], np.cumsum(self._dys)))
+        self._cycle_dx = int(self._prefix_x[-1])
+        self._cycle_dy = int(self._prefix_y[-1])
     
     def move(self, time: int) -> Tuple[int, int]:
         """Move obstacle according to its pattern"""
@@ -43,15 +51,21 @@ class DynamicObstacle:
     
     def get_position_at_time(self, time: int) -> Tuple[int, int]:
         """Predict position at future time (for planning)"""
+        # Moves 0..effective_time of the cyclic pattern have been applied
         effective_time = time // self.interval
-        pattern_index = effective_time % len(self.pattern)
-        
-        current_pos = self.history[0]
-        for i in range(effective_time + 1):
-            dx, dy = self.pattern[i % len(self.pattern)].value
-            current_pos = (current_pos[0] + dx, current_pos[1] + dy)
-        
-        return current_pos
+        cycles, r = divmod(effective_time, len(self.pattern))
+        dx = cycles * self._cycle_dx + int(self._prefix_x[r + 1])
+        dy = cycles * self._cycle_dy + int(self._prefix_y[r + 1])
+        start_x, start_y = self.history[0]
+        return (start_x + dx, start_y + dy)
+    
+    def positions_at_times(self, times: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Vectorized get_position_at_time over an array of times"""
+        cycles, r = np.divmod(times // self.interval, len(self.pattern))
+        start_x, start_y = self.history[0]
+        xs = start_x + cycles * self._cycle_dx + self._prefix_x[r + 1]
+        ys = start_y + cycles * self._cycle_dy + self._prefix_y[r + 1]
+        return xs, ys
 
 class GridEnvironment:
     """Main environment class representing the grid world"""
@@ -65,13 +79,55 @@ class GridEnvironment:
         self.packages: Dict[int, Tuple[int, int]] = {}
         self.start_position: Tuple[int, int] = (0, 0)
         self.delivery_points: Set[Tuple[int, int]] = set()
+        # Contiguous lookup arrays, built by finalize() or lazily on first query.
+        # Call invalidate() after editing grid or obstacles once they exist
+        self._cost: Optional[np.ndarray] = None
+        self._static: Optional[np.ndarray] = None
+        self._cost_padded: Optional[np.ndarray] = None
+        self._static_padded: Optional[np.ndarray] = None
+        self._dyn_occ: Optional[np.ndarray] = None
+        # Recently built obstruction masks by time, least recently used first
+        self._mask_cache: OrderedDict = OrderedDict()
+        self._mask_cache_size = 64
+        
+    def invalidate(self):
+        """Drop the lookup arrays after grid or obstacle edits, the next query rebuilds them"""
+        self._cost = None
+        self._static = None
+        self._cost_padded = None
+        self._static_padded = None
+        self._dyn_occ = None
+        self._mask_cache.clear()
         
+    @classmethod
+    def from_file(cls, filename: str) -> 'GridEnvironment':
+        """Create an environment from a map file, allocated at the size in its header"""
+        width, height = cls._read_size(filename) or (1, 1)
+        env = cls(width, height)
+        env.load_from_file(filename)
+        return env
+    
+    @staticmethod
+    def _read_size(filename: str) -> Optional[Tuple[int, int]]:
+        """Read just the SIZE header, inline ("SIZE: 10 10") or on the next line"""
+        with open(filename, 'r') as f:
+            lines = (line.strip() for line in f)
+            for line in lines:
+                if line.upper().startswith('SIZE:'):
+                    values = line[5:].split() or next((l for l in lines if l), '').split()
+                    if len(values) >= 2:
+                        return int(values[0]), int(values[1])
+                    return None
+        return None
+    
     def load_from_file(self, filename: str):
         """Load environment configuration from file"""
         with open(filename, 'r') as f:
             lines = [line.strip() for line in f if line.strip() and not line.startswith('#')]
         
         current_section = None
+        terrain_row = 0
+        static_tokens = []
         for line in lines:
             if line.endswith(':'):
                 current_section = line[:-1].upper()
@@ -92,20 +148,14 @@ class GridEnvironment:
                     self.delivery_points.add((x, y))
                     
             elif current_section == 'TERRAIN':
-                row_data = list(map(int, line.split()))
-                if len(self.grid) > 0:
-                    y = len([l for l in lines if l.startswith('TERRAIN:') or 
-                           (current_section == 'TERRAIN' and not l.endswith(':'))]) - 1
-                    if y < self.height:
-                        for x, cost in enumerate(row_data[:self.width]):
-                            self.grid[y, x] = cost
+                if terrain_row < self.height:
+                    row = np.fromstring(line, sep=' ', dtype=np.int32)[:self.width]
+                    self.grid[terrain_row, :row.size] = row
+                terrain_row += 1
                             
             elif current_section == 'OBSTACLES':
                 if line.startswith('STATIC:'):
-                    obstacles = line[7:].strip().split()
-                    for obstacle in obstacles:
-                        x, y = map(int, obstacle.split(':'))
-                        self.static_obstacles.add((x, y))
+                    static_tokens.extend(line[7:].split())
                         
                 elif line.startswith('DYNAMIC:'):
                     parts = line[8:].strip().split(':')
@@ -116,12 +166,115 @@ class GridEnvironment:
                     self.dynamic_obstacles[name] = DynamicObstacle(
                         name, (x, y), [direction], interval
                     )
+        
+        if static_tokens:
+            coords = np.array([token.split(':') for token in static_tokens], dtype=int)
+            self.static_obstacles.update(zip(coords[:, 0].tolist(), coords[:, 1].tolist()))
+            
+        self.finalize()
+    
+    def finalize(self, t_horizon: Optional[int] = None):
+        """
+        Build the contiguous cost, static-obstacle and dynamic-occupancy arrays.
+        Queries call this lazily; call it (or invalidate()) again after editing grid or obstacles.
+        """
+        self._cost = np.ascontiguousarray(self.grid, dtype=np.int32)
+        self._static = np.zeros((self.height, self.width), dtype=np.uint8)
+        if self.static_obstacles:
+            xs, ys = np.array(list(self.static_obstacles), dtype=int).T
+            inside = (xs >= 0) & (xs < self.width) & (ys >= 0) & (ys < self.height)
+            self._static[ys[inside], xs[inside]] = 1
+                
+        # Same arrays with a blocked sentinel ring, indexed at [y + 1, x + 1]
+        self._cost_padded = np.full((self.height + 2, self.width + 2), 999, dtype=np.int32)
+        self._cost_padded[1:-1, 1:-1] = self._cost
+        self._static_padded = np.ones((self.height + 2, self.width + 2), dtype=np.uint8)
+        self._static_padded[1:-1, 1:-1] = self._static
+        self._build_dyn_table(t_horizon or 2 * (self.width + self.height))
+        self._mask_cache.clear()
+        
+    def _ensure_finalized(self):
+        """Build lookup arrays on first use"""
+        if self._cost is None:
+            self.finalize()
+            
+    def ensure_horizon(self, t_horizon: int):
+        """Make the dynamic occupancy table cover times [0, t_horizon)"""
+        self._ensure_finalized()
+        if self.dynamic_obstacles and len(self._dyn_occ) < t_horizon:
+            self._build_dyn_table(max(t_horizon, 2 * len(self._dyn_occ)))
+    
+    @property
+    def terrain_cost_array(self) -> np.ndarray:
+        """Movement cost of every cell as a contiguous int32 (H, W) array"""
+        self._ensure_finalized()
+        return self._cost
+    
+    @property
+    def static_mask(self) -> np.ndarray:
+        """Static obstacles as a uint8 (H, W) array"""
+        self._ensure_finalized()
+        return self._static
+    
+    @property
+    def padded_cost_array(self) -> np.ndarray:
+        """terrain_cost_array surrounded by a ring of cost-999 cells"""
+        self._ensure_finalized()
+        return self._cost_padded
+    
+    @property
+    def padded_static_mask(self) -> np.ndarray:
+        """static_mask surrounded by a ring of blocked cells"""
+        self._ensure_finalized()
+        return self._static_padded
+    
+    @property
+    def dynamic_occupancy(self) -> np.ndarray:
+        """Dynamic obstacles as a uint8 (T, H, W) array, empty if there are none"""
+        self._ensure_finalized()
+        return self._dyn_occ
+    
+    def _build_dyn_table(self, t_horizon: int):
+        """Precompute dynamic obstacle occupancy for times [0, t_horizon)"""
+        if not self.dynamic_obstacles:
+            t_horizon = 0
+        self._dyn_occ = np.zeros((t_horizon, self.height, self.width), dtype=np.uint8)
+        times = np.arange(t_horizon)
+        for obstacle in self.dynamic_obstacles.values():
+            xs, ys = obstacle.positions_at_times(times)
+            inside = (xs >= 0) & (xs < self.width) & (ys >= 0) & (ys < self.height)
+            self._dyn_occ[times[inside], ys[inside], xs[inside]] = 1
+    
+    def obstruction_mask(self, time: int) -> np.ndarray:
+        """Cells obstructed at the given time as a read-only bool (H, W) array"""
+        self._ensure_finalized()
+        mask = self._mask_cache.get(time)
+        if mask is not None:
+            self._mask_cache.move_to_end(time)
+            return mask
+            
+        mask = self._static.astype(bool)
+        if 0 <= time < len(self._dyn_occ):
+            mask |= self._dyn_occ[time].astype(bool)
+        else:
+            # Outside the table: place each dynamic obstacle directly
+            for obstacle in self.dynamic_obstacles.values():
+                x, y = obstacle.get_position_at_time(time)
+                if self.is_within_bounds(x, y):
+                    mask[y, x] = True
+        mask.setflags(write=False)
+        
+        self._mask_cache[time] = mask
+        if len(self._mask_cache) > self._mask_cache_size:
+            self._mask_cache.popitem(last=False)
+        return mask
     
     def get_terrain_cost(self, x: int, y: int) -> int:
         """Get movement cost for a cell"""
         if not self.is_within_bounds(x, y):
             return 999
-        return self.grid[y, x]
+        self._ensure_finalized()
+        return int(self._cost[y, x])
     
     def is_within_bounds(self, x: int, y: int) -> bool:
         """Check if coordinates are within grid bounds"""
@@ -129,6 +282,20 @@ class GridEnvironment:
     
     def is_obstructed(self, x: int, y: int, time: int) -> bool:
         """Check if cell is obstructed at given time"""
+        self._ensure_finalized()
+        if self.is_within_bounds(x, y):
+            if self._static[y, x]:
+                return True
+            if not self.dynamic_obstacles:
+                return False
+            if 0 <= time < len(self._dyn_occ):
+                return bool(self._dyn_occ[time, y, x])
+                
+        # Outside the table: check obstacles directly
+        return self._is_obstructed_slow(x, y, time)
+    
+    def _is_obstructed_slow(self, x: int, y: int, time: int) -> bool:
+        """Check obstacles one by one without the lookup tables"""
         # Check static obstacles
         if (x, y) in self.static_obstacles:
             return True
@@ -143,6 +310,32 @@ class GridEnvironment:
     
     def get_valid_moves(self, x: int, y: int, time: int) -> List[Tuple[int, int, int]]:
         """Get valid moves from current position with their costs"""
+        if not self.is_within_bounds(x, y) or time < 0:
+            return self._get_valid_moves_slow(x, y, time)
+            
+        self._ensure_finalized()
+        if self.dynamic_obstacles:
+            if time >= len(self._dyn_occ):
+                self.ensure_horizon(time + 1)
+            occupied = self._dyn_occ[time]
+        else:
+            occupied = self._static  # Nothing dynamic, static check is enough
+        static, cost = self._static, self._cost
+        
+        # Unrolled in Direction order: up, down, left, right
+        moves = []
+        if y > 0 and not static[y - 1, x] and not occupied[y - 1, x]:
+            moves.append((x, y - 1, int(cost[y - 1, x])))
+        if y + 1 < self.height and not static[y + 1, x] and not occupied[y + 1, x]:
+            moves.append((x, y + 1, int(cost[y + 1, x])))
+        if x > 0 and not static[y, x - 1] and not occupied[y, x - 1]:
+            moves.append((x - 1, y, int(cost[y, x - 1])))
+        if x + 1 < self.width and not static[y, x + 1] and not occupied[y, x + 1]:
+            moves.append((x + 1, y, int(cost[y, x + 1])))
+        return moves
+    
+    def _get_valid_moves_slow(self, x: int, y: int, time: int) -> List[Tuple[int, int, int]]:
+        """Generic move generation for positions or times outside the tables"""
         moves = []
         for direction in [Direction.UP, Direction.DOWN, Direction.LEFT, Direction.RIGHT]:
             dx, dy = direction.value
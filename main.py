@@ -2,18 +2,30 @@
 Main program for autonomous delivery agent project.
 Command-line interface for running different algorithms and scenarios.
 """
+import gc
 import time
 import argparse
 import sys
 import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import starmap
+from typing import Optional
 
 # Add src directory to Python path
 sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
 
 from src.environment import GridEnvironment
 from src.agent import DeliveryAgent
-from src.visualizer import DeliveryVisualizer
-from src.algorithms import BFS, UniformCostSearch, AStarSearch
+from src.algorithms import BFS, UniformCostSearch, AStarSearch, path_cost
+
+# (name, factory) pairs run by benchmark_algorithms, in report order
+BENCHMARK_ALGORITHMS = (
+    ('BFS', BFS),
+    ('UCS', UniformCostSearch),
+    ('A* Manhattan', partial(AStarSearch, heuristic='manhattan')),
+    ('A* Euclidean', partial(AStarSearch, heuristic='euclidean')),
+)
 
 def create_test_maps():
     """Create test map files if they don't exist"""
@@ -25,60 +37,90 @@ def create_test_maps():
     # Map content would be created here (same as above)
     print("Test maps are ready in maps/ directory")
 
-def benchmark_algorithms():
-    """Benchmark different search algorithms"""
-    print("Loading environment...")
-    env = GridEnvironment(10, 10)
+def _run_one(factory, map_file: str, start_pos, goal_pos) -> dict:
+    """Time one benchmark search, loading the map in-process so workers share nothing"""
+    env = GridEnvironment.from_file(map_file)
+    algorithm = factory(env)
+    
+    # Discarded self-path search pays first-call costs (numba cache load, allocator warmup)
+    algorithm.search(start_pos, start_pos)
+    algorithm.nodes_expanded = 0
     
+    # Only the search itself is timed, path cost is computed afterwards.
+    # Cyclic GC is held off so a collection cannot land inside the measurement
+    gc.collect()
+    gc.disable()
     try:
-        env.load_from_file('maps/small.map')
-    except FileNotFoundError:
-        print("Error: maps/small.map not found. Run with --create-maps first.")
-        return {}
+        start_time = time.perf_counter()
+        path = algorithm.search(start_pos, goal_pos)
+        end_time = time.perf_counter()
+    finally:
+        gc.enable()
+        gc.collect()
     
-    algorithms = {
-        'BFS': BFS(env),
-        'UCS': UniformCostSearch(env),
-        'A* Manhattan': AStarSearch(env, 'manhattan'),
-        'A* Euclidean': AStarSearch(env, 'euclidean')
+    if path:
+        path_length = len(path)
+        total_cost = path_cost(env, path)
+    else:
+        path_length = 0
+        total_cost = float('inf')
+    
+    return {
+        'path_length': path_length,
+        'total_cost': total_cost,
+        'computation_time': end_time - start_time,
+        'nodes_expanded': algorithm.nodes_expanded,
+        'path_found': path is not None
     }
+
+def benchmark_algorithms(map_file: str = 'maps/small.map', max_workers: Optional[int] = None):
+    """Benchmark different search algorithms, one worker process per algorithm"""
+    print("Loading environment...")
+    try:
+        env = GridEnvironment.from_file(map_file)
+    except FileNotFoundError:
+        print(f"Error: {map_file} not found. Run with --create-maps first.")
+        return {}
     
-    results = {}
     start_pos = env.start_position
-    goal_pos = list(env.packages.values())[0] if env.packages else (5, 5)
+    goal_pos = next(iter(env.packages.values()), (5, 5))
+    if max_workers is None:
+        max_workers = min(len(BENCHMARK_ALGORITHMS), os.cpu_count() or 1)
     
     print(f"Benchmarking algorithms from {start_pos} to {goal_pos}...")
     
-    for name, algorithm in algorithms.items():
-        print(f"Running {name}...")
-        start_time = time.time()
-        path = algorithm.search(start_pos, goal_pos)
-        end_time = time.time()
-        
-        if path:
-            path_length = len(path)
-            total_cost = sum(env.get_terrain_cost(*pos) for pos in path[1:])
-        else:
-            path_length = 0
-            total_cost = float('inf')
-        
-        results[name] = {
-            'path_length': path_length,
-            'total_cost': total_cost,
-            'computation_time': end_time - start_time,
-            'nodes_expanded': algorithm.nodes_expanded,
-            'path_found': path is not None
-        }
-    
-    return results
+    # The searches are independent, run them side by side and report in table order
+    jobs = [(factory, map_file, start_pos, goal_pos) for _, factory in BENCHMARK_ALGORITHMS]
+    
+    def collect(runs) -> dict:
+        results = {}
+        for (name, _), metrics in zip(BENCHMARK_ALGORITHMS, runs):
+            print(f"Finished {name} ({metrics['computation_time']:.4f}s)")
+            results[name] = metrics
+        return results
+    
+    if max_workers == 1:
+        return collect(starmap(_run_one, jobs))
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        return collect(executor.map(_run_one, *zip(*jobs)))
+
+def write_benchmark_results(results: dict, output_file: str):
+    """Write benchmark results as NDJSON, one line per algorithm"""
+    import json
+    import math
+    with open(output_file, 'w') as f:
+        for algo, metrics in results.items():
+            # No path means infinite cost, written as null to stay strict JSON
+            record = {'algorithm': algo, **metrics}
+            if math.isinf(record['total_cost']):
+                record['total_cost'] = None
+            f.write(json.dumps(record) + '\n')
 
 def run_delivery_simulation(map_file: str, algorithm: str, heuristic: str, visualize: bool):
     """Run a complete delivery simulation"""
     print(f"Loading map: {map_file}")
-    env = GridEnvironment(1, 1)  # Will be resized by load_from_file
-    
     try:
-        env.load_from_file(map_file)
+        env = GridEnvironment.from_file(map_file)
     except FileNotFoundError:
         print(f"Error: Map file {map_file} not found.")
         return
@@ -100,7 +142,7 @@ def run_delivery_simulation(map_file: str, algorithm: str, heuristic: str, visua
         return
     
     print(f"Planned route: {len(route)} steps")
-    estimated_cost = sum(env.get_terrain_cost(*pos) for pos in route[1:])
+    estimated_cost = path_cost(env, route)
     print(f"Estimated cost: {estimated_cost}")
     
     print("\nExecuting delivery...")
@@ -114,11 +156,35 @@ def run_delivery_simulation(map_file: str, algorithm: str, heuristic: str, visua
     
     if visualize:
         print("\nStarting visualization...")
+        # matplotlib is only imported when a window is actually wanted
+        from src.visualizer import DeliveryVisualizer
         visualizer = DeliveryVisualizer(env)
         visualizer.animate_delivery(status.path_taken, interval=800)
     
     return status
 
+def _run_test_module(module_name: str) -> bool:
+    """Run a single test module, returns True if every test passed"""
+    import importlib
+    import unittest
+    suite = unittest.TestLoader().loadTestsFromModule(importlib.import_module(module_name))
+    return unittest.TextTestRunner(verbosity=2).run(suite).wasSuccessful()
+
+def run_tests(parallel: bool = False) -> bool:
+    """Run the unit test modules, listed explicitly to skip filesystem discovery"""
+    import unittest
+    from tests import test_agent, test_algorithms, test_environment
+    modules = (test_agent, test_algorithms, test_environment)
+    
+    if parallel:
+        with ProcessPoolExecutor(max_workers=len(modules)) as executor:
+            return all(executor.map(_run_test_module, [module.__name__ for module in modules]))
+            
+    loader = unittest.TestLoader()
+    suite = unittest.TestSuite([loader.loadTestsFromModule(module) for module in modules])
+    runner = unittest.TextTestRunner(verbosity=2)
+    return runner.run(suite).wasSuccessful()
+
 def main():
     parser = argparse.ArgumentParser(description='Autonomous Delivery Agent - CSA2001 AI/ML Project')
     parser.add_argument('--map', type=str, default='maps/small.map', 
@@ -128,15 +194,19 @@ def main():
                        help='Search algorithm to use')
     parser.add_argument('--heuristic', type=str, default='manhattan',
                        choices=['manhattan', 'euclidean', 'chebyshev'], 
-                       help='Heuristic for A*')
+                       help='Heuristic for single-path A* (delivery route planning with astar runs UCS and ignores it)')
     parser.add_argument('--benchmark', action='store_true', 
                        help='Run algorithm benchmark comparison')
+    parser.add_argument('--benchmark-output', type=str, metavar='PATH',
+                       help='Also write benchmark results to PATH, one JSON object per line')
     parser.add_argument('--visualize', action='store_true', 
                        help='Show graphical visualization')
     parser.add_argument('--create-maps', action='store_true',
                        help='Create test map files')
     parser.add_argument('--test', action='store_true',
                        help='Run unit tests')
+    parser.add_argument('--parallel', action='store_true',
+                       help='Run each test module in its own process (with --test)')
     
     args = parser.parse_args()
     
@@ -147,11 +217,7 @@ def main():
     
     if args.test:
         print("Running unit tests...")
-        import unittest
-        loader = unittest.TestLoader()
-        suite = loader.discover('tests')
-        runner = unittest.TextTestRunner(verbosity=2)
-        result = runner.run(suite)
+        run_tests(args.parallel)
         return
     
     if args.benchmark:
@@ -170,8 +236,13 @@ def main():
             print(f"  Computation Time: {metrics['computation_time']:.4f}s")
             print(f"  Nodes Expanded: {metrics['nodes_expanded']}")
         
+        if args.benchmark_output:
+            write_benchmark_results(results, args.benchmark_output)
+            print(f"\nResults written to {args.benchmark_output}")
+            
         if args.visualize:
             try:
+                from src.visualizer import DeliveryVisualizer
                 visualizer = DeliveryVisualizer(GridEnvironment(1, 1))
                 visualizer.plot_metrics(results)
             except Exception as e:
@@ -9,9 +9,13 @@ from src.environment import GridEnvironment
 
 class TestDeliveryAgent(unittest.TestCase):
     
+    @classmethod
+    def setUpClass(cls):
+        # The agent never modifies its environment, so one parsed map serves every test
+        cls.env = GridEnvironment(10, 10)
+        cls.env.load_from_file('maps/small.map')
+        
     def setUp(self):
-        self.env = GridEnvironment(10, 10)
-        self.env.load_from_file('maps/small.map')
         self.agent = DeliveryAgent(self.env)
         
     def test_agent_initialization(self):
@@ -31,6 +35,15 @@ class TestDeliveryAgent(unittest.TestCase):
         self.assertIsInstance(path, list)
         self.assertTrue(len(path) > 0)
         
+    def test_find_distances_to_many(self):
+        goals = [(9, 9), (0, 5), (5, 5)]  # (5, 5) is a static obstacle
+        distances = self.agent.find_distances_to_many((0, 0), goals, 'ucs')
+        self.assertEqual(set(distances), {(9, 9), (0, 5)})
+        for goal, (cost, path) in distances.items():
+            self.assertEqual(path[0], (0, 0))
+            self.assertEqual(path[-1], goal)
+            self.assertEqual(cost, sum(self.env.get_terrain_cost(*pos) for pos in path[1:]))
+        
     def test_execute_route(self):
         route = [(0, 0), (1, 0), (2, 0), (3, 0)]
         status = self.agent.execute_route(route, max_steps=10)
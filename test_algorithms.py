@@ -2,19 +2,18 @@
 import unittest
 import sys
 import os
+import random
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
-from src.algorithms import BFS, UniformCostSearch, AStarSearch, HillClimbing, SimulatedAnnealing
-from src.environment import GridEnvironment
+from src.algorithms import BFS, UniformCostSearch, AStarSearch, MultiGoalAStar, HillClimbing, SimulatedAnnealing
+from src.environment import GridEnvironment, DynamicObstacle, Direction
 
 class TestSearchAlgorithms(unittest.TestCase):
     
     def setUp(self):
         self.env = GridEnvironment(5, 5)
         # Create a simple grid for testing
-        for y in range(5):
-            for x in range(5):
-                self.env.grid[y, x] = 1  # All roads
+        self.env.grid[:] = 1  # All roads
         
     def test_bfs_find_path(self):
         bfs = BFS(self.env)
@@ -45,6 +44,53 @@ class TestSearchAlgorithms(unittest.TestCase):
             path = astar.search((0, 0), (4, 4))
             self.assertIsNotNone(path)
             
+    def test_env_edits_after_query(self):
+        astar = AStarSearch(self.env, 'manhattan')
+        self.assertEqual(astar.search((0, 2), (4, 2)), [(x, 2) for x in range(5)])
+        self.assertFalse(self.env.is_obstructed(2, 2, 0))
+        
+        # Edits made after the lookup arrays exist are picked up after invalidate()
+        self.env.static_obstacles.add((2, 2))
+        self.env.grid[2, 1] = 9
+        self.env.invalidate()
+        self.assertTrue(self.env.is_obstructed(2, 2, 0))
+        self.assertEqual(self.env.get_terrain_cost(1, 2), 9)
+        path = astar.search((0, 2), (4, 2))
+        self.assertNotIn((2, 2), path)
+        self.assertNotIn((1, 2), path)
+        
+    def test_astar_jit_matches_python(self):
+        # The kernel must break ties like the Python search, or dynamic
+        # obstacles can make one find a path the other misses
+        rng = random.Random(0)
+        for _ in range(200):
+            width, height = rng.randint(2, 7), rng.randint(2, 7)
+            env = GridEnvironment(width, height)
+            for y in range(height):
+                for x in range(width):
+                    env.grid[y, x] = rng.randint(1, 4)
+            for _ in range(rng.randint(0, 3)):
+                env.static_obstacles.add((rng.randrange(width), rng.randrange(height)))
+            for k in range(rng.randint(1, 3)):
+                pattern = [rng.choice(list(Direction)) for _ in range(rng.randint(1, 3))]
+                env.dynamic_obstacles[f'd{k}'] = DynamicObstacle(
+                    f'd{k}', (rng.randrange(width), rng.randrange(height)), pattern, rng.randint(1, 3))
+            start = (rng.randrange(width), rng.randrange(height))
+            goal = (rng.randrange(width), rng.randrange(height))
+            for heuristic in ('manhattan', 'euclidean', 'chebyshev'):
+                self.assertEqual(AStarSearch(env, heuristic).search(start, goal),
+                                 AStarSearch(env, heuristic, use_jit=False).search(start, goal))
+            
+    def test_multi_goal_astar(self):
+        self.env.packages = {1: (4, 0), 2: (0, 4)}
+        astar = MultiGoalAStar(self.env, 'manhattan')
+        path = astar.search((0, 0))
+        self.assertIsNotNone(path)
+        self.assertEqual(path[0], (0, 0))
+        self.assertIn((4, 0), path)
+        self.assertIn((0, 4), path)
+        self.assertEqual(len(path), 13)  # 4 steps out, 8 steps across
+            
     def test_hill_climbing(self):
         hc = HillClimbing(self.env)
         initial_path = [(0, 0), (1, 0), (2, 0), (3, 0), (4, 0), (4, 1), (4, 2), (4, 3), (4, 4)]
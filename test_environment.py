@@ -21,6 +21,41 @@ class TestEnvironment(unittest.TestCase):
         self.assertTrue(self.env.is_obstructed(5, 5, 0))
         self.assertFalse(self.env.is_obstructed(0, 0, 0))
         
+    def test_dynamic_obstacle_detection(self):
+        car = DynamicObstacle('car', (2, 2), [Direction.RIGHT], 2)
+        self.env.dynamic_obstacles['car'] = car
+        for time in range(0, 10):
+            obs_pos = car.get_position_at_time(time)
+            self.assertTrue(self.env.is_obstructed(*obs_pos, time))
+        self.assertFalse(self.env.is_obstructed(2, 2, 5))
+        
+    def test_obstruction_mask(self):
+        self.env.static_obstacles.add((5, 5))
+        self.env.dynamic_obstacles['car'] = DynamicObstacle('car', (2, 2), [Direction.RIGHT], 2)
+        self.env.finalize(t_horizon=4)
+        for time in (0, 3, 7, -1):  # inside and outside the occupancy table
+            mask = self.env.obstruction_mask(time)
+            self.assertEqual(mask.shape, (10, 10))
+            for y in range(10):
+                for x in range(10):
+                    self.assertEqual(mask[y, x], self.env.is_obstructed(x, y, time))
+        self.assertIs(self.env.obstruction_mask(3), self.env.obstruction_mask(3))
+        
+        # Cached masks are dropped by invalidate()
+        self.assertFalse(self.env.obstruction_mask(3)[0, 0])
+        self.env.static_obstacles.add((0, 0))
+        self.env.invalidate()
+        self.assertTrue(self.env.obstruction_mask(3)[0, 0])
+        del self.env.dynamic_obstacles['car']
+        self.env.invalidate()
+        self.assertFalse(self.env.obstruction_mask(0)[2, 2])
+        
+    def test_from_file(self):
+        env = GridEnvironment.from_file('maps/small.map')
+        self.assertEqual((env.width, env.height), (10, 10))
+        self.assertEqual(env.grid.shape, (10, 10))
+        self.assertEqual(env.get_terrain_cost(3, 3), 3)
+        
     def test_boundary_check(self):
         self.assertTrue(self.env.is_within_bounds(0, 0))
         self.assertTrue(self.env.is_within_bounds(9, 9))
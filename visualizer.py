@@ -1,102 +1,159 @@
 """
 Visualization utilities for the delivery agent.
 """
+import numpy as np
 import matplotlib.pyplot as plt
 import matplotlib.patches as patches
+from matplotlib.collections import PatchCollection
+from matplotlib.colors import ListedColormap, BoundaryNorm
 from matplotlib.animation import FuncAnimation
-from typing import List, Tuple
+from typing import List, Tuple, Optional
 from src.environment import GridEnvironment
 
+# Terrain colors by cost: road, grass, mud, and water/other for anything else
+TERRAIN_CMAP = ListedColormap(['lightgray', 'lightgreen', 'brown', 'lightblue'])
+TERRAIN_CMAP.set_under('lightblue')
+TERRAIN_CMAP.set_over('lightblue')
+TERRAIN_NORM = BoundaryNorm([0.5, 1.5, 2.5, 3.5, 4.5], TERRAIN_CMAP.N)
+
 class DeliveryVisualizer:
     """Visualize the delivery agent's progress"""
     
     def __init__(self, environment: GridEnvironment):
         self.env = environment
-        self.fig, self.ax = plt.subplots(figsize=(10, 10))
+        # The environment figure is only created once something is drawn on it
+        self.fig = None
+        self.ax = None
+        # Artists are created by the first plot_environment call and updated in place
+        self._im = None
+        self._cost_labels = []
+        self._obstacles = None
+        self._agent = None
+        self._agent_label = None
+        self._time_label = None
         
-    def plot_environment(self, agent_pos: Tuple[int, int] = None, time: int = 0):
-        """Plot the grid environment"""
-        self.ax.clear()
+    def _ensure_fig(self):
+        """Create the environment figure on first use"""
+        if self.fig is None:
+            self.fig, self.ax = plt.subplots(figsize=(10, 10))
+            # An animation closed early must not leave its artists hidden from normal draws
+            self.fig.canvas.mpl_connect('close_event', lambda event: self._set_animated(False))
+            
+    def _set_animated(self, animated: bool):
+        """Toggle blitting on the artists that change between frames"""
+        for artist in (self._obstacles, self._agent, self._agent_label, self._time_label):
+            if artist is not None:
+                artist.set_animated(animated)
+            
+    def _draw_static(self):
+        """Create the terrain image and the artists reused across frames"""
+        w, h = self.env.width, self.env.height
+        self._im = self.ax.imshow(self.env.terrain_cost_array, cmap=TERRAIN_CMAP, norm=TERRAIN_NORM,
+                                  origin='lower', extent=(0, w, 0, h), interpolation='nearest',
+                                  alpha=0.7)
         
-        # Create grid visualization
-        for y in range(self.env.height):
-            for x in range(self.env.width):
-                cost = self.env.get_terrain_cost(x, y)
-                color = self.get_color_for_terrain(cost)
-                
-                rect = patches.Rectangle((x, y), 1, 1, linewidth=1, 
-                                       edgecolor='black', facecolor=color, alpha=0.7)
-                self.ax.add_patch(rect)
-                
-                # Add cost text
-                self.ax.text(x + 0.5, y + 0.5, str(cost), ha='center', va='center', fontsize=8)
-                
-                # Mark obstacles
-                if self.env.is_obstructed(x, y, time):
-                    self.ax.text(x + 0.5, y + 0.5, 'X', ha='center', va='center', 
-                               fontsize=12, fontweight='bold', color='red')
-                
-                # Mark delivery points
-                if (x, y) in self.env.delivery_points:
-                    circle = patches.Circle((x + 0.5, y + 0.5), 0.3, fill=True, color='green')
-                    self.ax.add_patch(circle)
+        # Mark delivery points
+        circles = [patches.Circle((x + 0.5, y + 0.5), 0.3) for x, y in self.env.delivery_points]
+        self.ax.add_collection(PatchCollection(circles, facecolor='green', edgecolor='green'))
+        
+        # Mark obstacles
+        self._obstacles = self.ax.scatter([], [], marker='x', c='red', s=80, linewidths=2, zorder=3)
         
         # Mark agent position
-        if agent_pos:
-            agent_circle = patches.Circle((agent_pos[0] + 0.5, agent_pos[1] + 0.5), 
-                                        0.4, fill=True, color='blue')
-            self.ax.add_patch(agent_circle)
-            self.ax.text(agent_pos[0] + 0.5, agent_pos[1] + 0.5, 'A', 
-                        ha='center', va='center', fontweight='bold', color='white')
+        self._agent = self.ax.add_patch(patches.Circle((0.5, 0.5), 0.4, fill=True, color='blue',
+                                                       visible=False, zorder=4))
+        self._agent_label = self.ax.text(0.5, 0.5, 'A', ha='center', va='center', fontweight='bold',
+                                         color='white', visible=False, zorder=5)
         
-        self.ax.set_xlim(0, self.env.width)
-        self.ax.set_ylim(0, self.env.height)
+        self.ax.set_xlim(0, w)
+        self.ax.set_ylim(0, h)
         self.ax.set_aspect('equal')
         self.ax.grid(True)
+        
+    def plot_environment(self, agent_pos: Tuple[int, int] = None, time: int = 0,
+                         show_cost_labels: bool = False):
+        """Plot the grid environment"""
+        self._ensure_fig()
+        if self._im is None:
+            self._draw_static()
+        else:
+            self._im.set_data(self.env.terrain_cost_array)
+            
+        # Cost text is one artist per cell, only drawn on request
+        if show_cost_labels and not self._cost_labels:
+            costs = self.env.terrain_cost_array
+            for y in range(self.env.height):
+                for x in range(self.env.width):
+                    self._cost_labels.append(self.ax.text(x + 0.5, y + 0.5, str(costs[y, x]),
+                                                          ha='center', va='center', fontsize=8))
+        for label in self._cost_labels:
+            label.set_visible(show_cost_labels)
+            
+        # A previous animation leaves its artists animated, which normal draws skip
+        self._set_animated(False)
+        if self._time_label is not None:
+            self._time_label.set_visible(False)
+        self._update_frame(agent_pos, time)
         self.ax.set_title(f'Delivery Environment (Time: {time})')
         
-    def get_color_for_terrain(self, cost: int) -> str:
-        """Get color representation for terrain cost"""
-        if cost == 1: return 'lightgray'   # Road
-        elif cost == 2: return 'lightgreen' # Grass
-        elif cost == 3: return 'brown'      # Mud
-        else: return 'lightblue'            # Water/other
-    
+    def _update_frame(self, agent_pos: Optional[Tuple[int, int]], time: int):
+        """Move the obstacle and agent artists to their state at the given time"""
+        ys, xs = np.nonzero(self.env.obstruction_mask(time))
+        self._obstacles.set_offsets(np.column_stack([xs + 0.5, ys + 0.5]))
+        
+        if agent_pos:
+            center = (agent_pos[0] + 0.5, agent_pos[1] + 0.5)
+            self._agent.set_center(center)
+            self._agent_label.set_position(center)
+        self._agent.set_visible(bool(agent_pos))
+        self._agent_label.set_visible(bool(agent_pos))
+        
     def animate_delivery(self, path: List[Tuple[int, int]], interval: int = 500):
         """Animate the delivery route"""
+        # The terrain is drawn once, frames only redraw the animated artists
+        self.plot_environment(path[0] if path else None, 0)
+        self.ax.set_title('Delivery Environment')
+        if self._time_label is None:
+            self._time_label = self.ax.text(0.02, 0.98, '', transform=self.ax.transAxes,
+                                            ha='left', va='top', fontweight='bold')
+        self._time_label.set_visible(True)
+        animated = (self._obstacles, self._agent, self._agent_label, self._time_label)
+        self._set_animated(True)
+            
         def update(frame):
-            if frame < len(path):
-                self.plot_environment(path[frame], frame)
-            return []
+            self._update_frame(path[frame], frame)
+            self._time_label.set_text(f'Time: {frame}')
+            if frame == len(path) - 1:
+                # Last frame: hand the artists back to normal drawing
+                self._set_animated(False)
+            return animated
         
-        anim = FuncAnimation(self.fig, update, frames=len(path), 
-                           interval=interval, repeat=False)
+        anim = FuncAnimation(self.fig, update, frames=len(path), interval=interval,
+                             repeat=False, blit=True, cache_frame_data=False)
         plt.show()
         return anim
 
     def plot_metrics(self, results: dict):
         """Plot comparative metrics for different algorithms"""
         algorithms = list(results.keys())
-        costs = [results[algo]['total_cost'] for algo in algorithms]
-        times = [results[algo]['computation_time'] for algo in algorithms]
-        nodes_expanded = [results[algo]['nodes_expanded'] for algo in algorithms]
+        panels = (('total_cost', 'Total Path Cost', 'Cost'),
+                  ('computation_time', 'Computation Time', 'Time (seconds)'),
+                  ('nodes_expanded', 'Nodes Expanded', 'Nodes'))
+        # One row per metric, one column per algorithm
+        metrics = np.array([[results[algo][key] for algo in algorithms] for key, _, _ in panels],
+                           dtype=float)
+        # One color per algorithm, however many the benchmark runs
+        colors = plt.cm.tab10(np.arange(len(algorithms)) % 10)
         
         fig, axes = plt.subplots(1, 3, figsize=(15, 5))
+        try:
+            for ax, row, (_, title, ylabel) in zip(axes, metrics, panels):
+                ax.bar(algorithms, row, color=colors)
+                ax.set_title(title)
+                ax.set_ylabel(ylabel)
         
-        # Cost comparison
-        axes[0].bar(algorithms, costs, color=['skyblue', 'lightgreen', 'lightcoral'])
-        axes[0].set_title('Total Path Cost')
-        axes[0].set_ylabel('Cost')
-        
-        # Time comparison
-        axes[1].bar(algorithms, times, color=['skyblue', 'lightgreen', 'lightcoral'])
-        axes[1].set_title('Computation Time')
-        axes[1].set_ylabel('Time (seconds)')
-        
-        # Nodes expanded comparison
-        axes[2].bar(algorithms, nodes_expanded, color=['skyblue', 'lightgreen', 'lightcoral'])
-        axes[2].set_title('Nodes Expanded')
-        axes[2].set_ylabel('Nodes')
-        
-        plt.tight_layout()
-        plt.show()
\ No newline at end of file
+            plt.tight_layout()
+            plt.show()
+        finally:
+            # pyplot keeps every figure alive until it is closed
+            plt.close(fig)
\ No newline at end of file